@@ -13,6 +13,7 @@ try:
     etl_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(etl_module)
     WeatherETL = etl_module.WeatherETL
+    from pipeline_profiler import enable_profiling, profiling_requested
 except ImportError as e:
     print(f"Error importing WeatherETL: {e}")
     sys.exit(1)
@@ -57,6 +58,9 @@ def run_daily_weather_collection():
 def main():
     print(f"=== Daily Weather ETL Scheduler - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
     
+    if profiling_requested():
+        enable_profiling()
+    
     success = run_daily_weather_collection()
     
     if success:
@@ -0,0 +1,167 @@
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+# A rule is a name (used as the quarantine reason) and a function that takes a
+# DataFrame and returns a boolean Series, True for every row that passes.
+ValidationRule = namedtuple('ValidationRule', ['name', 'check'])
+
+QUARANTINE_TABLE = 'quarantine'
+
+
+def _missing_column(df):
+    return pd.Series(False, index=df.index)
+
+
+def not_null(*columns):
+    # With no columns given, every column of the frame must be non-null.
+    def check(df):
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            return _missing_column(df)
+        return df[list(columns or df.columns)].notna().all(axis=1)
+
+    return ValidationRule(f"null:{','.join(columns) or '*'}", check)
+
+
+def in_range(column, min_value=None, max_value=None):
+    def check(df):
+        if column not in df.columns:
+            return _missing_column(df)
+        values = pd.to_numeric(df[column], errors='coerce')
+        passed = values.notna()
+        if min_value is not None:
+            passed &= values >= min_value
+        if max_value is not None:
+            passed &= values <= max_value
+        return passed
+
+    return ValidationRule(f"range:{column}[{min_value},{max_value}]", check)
+
+
+def greater_than(column, value):
+    def check(df):
+        if column not in df.columns:
+            return _missing_column(df)
+        return pd.to_numeric(df[column], errors='coerce') > value
+
+    return ValidationRule(f"greater_than:{column}>{value}", check)
+
+
+def one_of(column, allowed):
+    allowed = sorted(allowed)
+
+    def check(df):
+        if column not in df.columns:
+            return _missing_column(df)
+        return df[column].isin(allowed)
+
+    return ValidationRule(f"enum:{column}", check)
+
+
+def monotonic_timestamps(column, group_by=None):
+    def check(df):
+        if column not in df.columns or (group_by and group_by not in df.columns):
+            return _missing_column(df)
+        timestamps = pd.to_datetime(df[column], errors='coerce')
+        groups = df[group_by] if group_by else pd.Series(0, index=df.index)
+        # Each row is compared with the latest timestamp seen so far in its
+        # group, so one bogus late timestamp flags every row it overtakes.
+        # The first row of each group always passes; unparseable timestamps fail.
+        running_max = timestamps.groupby(groups, dropna=False).cummax()
+        previous_max = running_max.groupby(groups, dropna=False).shift()
+        previous_max = previous_max.groupby(groups, dropna=False).ffill()
+        return timestamps.notna() & (previous_max.isna() | (timestamps >= previous_max))
+
+    return ValidationRule(f"monotonic:{column}", check)
+
+
+def validate_dataframe(df, rules):
+    if df is None or df.empty:
+        return df, None
+
+    reasons = pd.Series('', index=df.index)
+    for rule in rules:
+        failed = ~rule.check(df).fillna(False).astype(bool)
+        if failed.any():
+            reasons[failed] = reasons[failed] + rule.name + ';'
+
+    bad = reasons != ''
+    valid_df = df[~bad]
+    if not bad.any():
+        return valid_df, None
+
+    # to_json serialises all rows in one call and writes missing values as
+    # null; newlines inside values are escaped, so each line is one record.
+    records = df[bad].to_json(orient='records', lines=True, date_format='iso').splitlines()
+    quarantined_df = pd.DataFrame({
+        'quarantined_at': datetime.now().isoformat(),
+        'reasons': reasons[bad].str.rstrip(';'),
+        'record': records
+    })
+    return valid_df, quarantined_df
+
+
+def create_quarantine_table(conn):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_table TEXT,
+            quarantined_at TEXT,
+            reasons TEXT,
+            record TEXT
+        )
+    ''')
+
+
+def load_quarantine(quarantined_df, source_table, database_path):
+    if quarantined_df is None or quarantined_df.empty:
+        return
+
+    conn = sqlite3.connect(database_path)
+    try:
+        create_quarantine_table(conn)
+        quarantined_df.assign(source_table=source_table).to_sql(
+            QUARANTINE_TABLE, conn, if_exists='append', index=False
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Quarantined {len(quarantined_df)} records from {source_table}")
+
+
+WEATHER_CONDITIONS = {
+    'Thunderstorm', 'Drizzle', 'Rain', 'Snow', 'Clear', 'Clouds', 'Mist', 'Smoke',
+    'Haze', 'Dust', 'Fog', 'Sand', 'Ash', 'Squall', 'Tornado'
+}
+
+_COMMON_WEATHER_RULES = [
+    not_null('city', 'country', 'temperature', 'humidity', 'pressure', 'weather_main'),
+    in_range('temperature', -90, 60),
+    in_range('feels_like', -110, 80),
+    in_range('humidity', 0, 100),
+    in_range('pressure', 870, 1085),
+    in_range('wind_speed', 0, 115),
+    in_range('wind_direction', 0, 360),
+    in_range('cloudiness', 0, 100),
+    in_range('visibility', 0, 10),
+    one_of('weather_main', WEATHER_CONDITIONS),
+]
+
+WEATHER_VALIDATION_RULES = {
+    'current_weather': _COMMON_WEATHER_RULES + [
+        not_null('timestamp', 'sunrise', 'sunset'),
+    ],
+    'weather_forecast': _COMMON_WEATHER_RULES + [
+        in_range('precipitation_probability', 0, 100),
+        monotonic_timestamps('forecast_timestamp', group_by='city'),
+    ],
+}
+
+LEGACY_USER_RULES = [
+    not_null(),
+    greater_than('0', 18),
+]
@@ -5,9 +5,39 @@ import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import json
+from data_validation import (
+    WEATHER_VALIDATION_RULES, LEGACY_USER_RULES, create_quarantine_table, load_quarantine, validate_dataframe
+)
+from pipeline_profiler import enable_profiling, profile_stage, profiling_requested
 
 load_dotenv()
 
+
+def _get_nested(data, *keys, default=None):
+    for key in keys:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return data
+
+
+# The field helpers below turn unusable values into None so that the row is
+# quarantined by validation instead of failing the whole transform.
+def _from_timestamp(value):
+    try:
+        return datetime.fromtimestamp(value).isoformat()
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _scaled(value, multiplier=1, divisor=1):
+    try:
+        return float(value) * multiplier / divisor
+    except (TypeError, ValueError):
+        return None
+
+
 class WeatherETL:
     def __init__(self):
         self.api_key = os.getenv('OPENWEATHER_API_KEY')
@@ -16,6 +46,7 @@ class WeatherETL:
         self.database_path = os.getenv('DATABASE_PATH', 'data/weather_data.db')
         self.base_url = "http://api.openweathermap.org/data/2.5"
         
+    @profile_stage()
     def extract_current_weather(self):
         if not self.api_key:
             raise ValueError("OpenWeatherMap API key not found. Please set OPENWEATHER_API_KEY in your .env file")
@@ -39,6 +70,7 @@ class WeatherETL:
             print(f"Error fetching weather data: {e}")
             return None
     
+    @profile_stage()
     def extract_forecast_data(self, days=5):
         if not self.api_key:
             raise ValueError("OpenWeatherMap API key not found. Please set OPENWEATHER_API_KEY in your .env file")
@@ -62,60 +94,66 @@ class WeatherETL:
             print(f"Error fetching forecast data: {e}")
             return None
 
+    @profile_stage()
     def transform_current_weather(self, weather_data):
         if not weather_data:
             return None
             
+        # Missing fields become nulls and are caught row-by-row in validation
+        # instead of failing the whole payload here.
         try:
             transformed_data = {
                 'timestamp': datetime.now().isoformat(),
-                'city': weather_data['name'],
-                'country': weather_data['sys']['country'],
-                'temperature': weather_data['main']['temp'],
-                'feels_like': weather_data['main']['feels_like'],
-                'humidity': weather_data['main']['humidity'],
-                'pressure': weather_data['main']['pressure'],
-                'weather_main': weather_data['weather'][0]['main'],
-                'weather_description': weather_data['weather'][0]['description'],
-                'wind_speed': weather_data['wind'].get('speed', 0),
-                'wind_direction': weather_data['wind'].get('deg', 0),
-                'cloudiness': weather_data['clouds']['all'],
-                'visibility': weather_data.get('visibility', 0) / 1000,
-                'sunrise': datetime.fromtimestamp(weather_data['sys']['sunrise']).isoformat(),
-                'sunset': datetime.fromtimestamp(weather_data['sys']['sunset']).isoformat()
+                'city': _get_nested(weather_data, 'name'),
+                'country': _get_nested(weather_data, 'sys', 'country'),
+                'temperature': _get_nested(weather_data, 'main', 'temp'),
+                'feels_like': _get_nested(weather_data, 'main', 'feels_like'),
+                'humidity': _get_nested(weather_data, 'main', 'humidity'),
+                'pressure': _get_nested(weather_data, 'main', 'pressure'),
+                'weather_main': _get_nested(weather_data, 'weather', 0, 'main'),
+                'weather_description': _get_nested(weather_data, 'weather', 0, 'description'),
+                'wind_speed': _get_nested(weather_data, 'wind', 'speed', default=0),
+                'wind_direction': _get_nested(weather_data, 'wind', 'deg', default=0),
+                'cloudiness': _get_nested(weather_data, 'clouds', 'all'),
+                'visibility': _scaled(_get_nested(weather_data, 'visibility', default=0), divisor=1000),
+                'sunrise': _from_timestamp(_get_nested(weather_data, 'sys', 'sunrise')),
+                'sunset': _from_timestamp(_get_nested(weather_data, 'sys', 'sunset'))
             }
             
             df = pd.DataFrame([transformed_data])
             print("Weather data transformed successfully")
             return df
             
-        except KeyError as e:
-            print(f"Error transforming weather data - missing key: {e}")
+        except (TypeError, ValueError, OSError) as e:
+            print(f"Error transforming weather data: {e}")
             return None
 
+    @profile_stage()
     def transform_forecast_data(self, forecast_data):
         if not forecast_data:
             return None
             
         try:
             forecast_list = []
+            city = _get_nested(forecast_data, 'city', 'name')
+            country = _get_nested(forecast_data, 'city', 'country')
             
             for item in forecast_data['list']:
                 forecast_item = {
-                    'forecast_timestamp': datetime.fromtimestamp(item['dt']).isoformat(),
-                    'city': forecast_data['city']['name'],
-                    'country': forecast_data['city']['country'],
-                    'temperature': item['main']['temp'],
-                    'feels_like': item['main']['feels_like'],
-                    'humidity': item['main']['humidity'],
-                    'pressure': item['main']['pressure'],
-                    'weather_main': item['weather'][0]['main'],
-                    'weather_description': item['weather'][0]['description'],
-                    'wind_speed': item['wind'].get('speed', 0),
-                    'wind_direction': item['wind'].get('deg', 0),
-                    'cloudiness': item['clouds']['all'],
-                    'visibility': item.get('visibility', 0) / 1000,
-                    'precipitation_probability': item['pop'] * 100
+                    'forecast_timestamp': _from_timestamp(_get_nested(item, 'dt')),
+                    'city': city,
+                    'country': country,
+                    'temperature': _get_nested(item, 'main', 'temp'),
+                    'feels_like': _get_nested(item, 'main', 'feels_like'),
+                    'humidity': _get_nested(item, 'main', 'humidity'),
+                    'pressure': _get_nested(item, 'main', 'pressure'),
+                    'weather_main': _get_nested(item, 'weather', 0, 'main'),
+                    'weather_description': _get_nested(item, 'weather', 0, 'description'),
+                    'wind_speed': _get_nested(item, 'wind', 'speed', default=0),
+                    'wind_direction': _get_nested(item, 'wind', 'deg', default=0),
+                    'cloudiness': _get_nested(item, 'clouds', 'all'),
+                    'visibility': _scaled(_get_nested(item, 'visibility', default=0), divisor=1000),
+                    'precipitation_probability': _scaled(_get_nested(item, 'pop'), multiplier=100)
                 }
                 forecast_list.append(forecast_item)
             
@@ -123,10 +161,28 @@ class WeatherETL:
             print(f"Forecast data transformed successfully - {len(forecast_list)} records")
             return df
             
-        except KeyError as e:
-            print(f"Error transforming forecast data - missing key: {e}")
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            print(f"Error transforming forecast data: {e}")
             return None
 
+    @profile_stage(label_arg='table_name')
+    def validate_weather_data(self, df, table_name):
+        if df is None or df.empty:
+            return df
+            
+        # A rule that raises is a bug in the rule set, so it is left to
+        # propagate rather than being reported as an empty batch.
+        valid_df, quarantined_df = validate_dataframe(df, WEATHER_VALIDATION_RULES[table_name])
+        print(f"Validated {len(df)} records for {table_name} - {len(valid_df)} passed")
+        
+        try:
+            load_quarantine(quarantined_df, table_name, self.database_path)
+        except Exception as e:
+            print(f"Error writing quarantined records for {table_name}: {e}")
+        
+        return valid_df
+
+    @profile_stage(label_arg='table_name')
     def load_weather_data(self, df, table_name):
         if df is None or df.empty:
             print("No data to load")
@@ -145,6 +201,7 @@ class WeatherETL:
         except Exception as e:
             print(f"Error loading data to database: {e}")
 
+    @profile_stage()
     def create_weather_tables(self):
         try:
             conn = sqlite3.connect(self.database_path)
@@ -192,6 +249,14 @@ class WeatherETL:
                 )
             ''')
             
+            create_quarantine_table(conn)
+            
+            # Indexes for the read paths in weather_api.py; WAL lets those
+            # readers keep serving while a load is writing.
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_current_weather_city_timestamp ON current_weather (city, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_weather_forecast_city_timestamp ON weather_forecast (city, forecast_timestamp)")
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             conn.commit()
             conn.close()
             print("Weather database tables created successfully")
@@ -209,6 +274,7 @@ class WeatherETL:
             current_weather_raw = self.extract_current_weather()
             if current_weather_raw:
                 current_weather_df = self.transform_current_weather(current_weather_raw)
+                current_weather_df = self.validate_weather_data(current_weather_df, 'current_weather')
                 if current_weather_df is not None:
                     self.load_weather_data(current_weather_df, 'current_weather')
             
@@ -217,6 +283,7 @@ class WeatherETL:
                 forecast_raw = self.extract_forecast_data()
                 if forecast_raw:
                     forecast_df = self.transform_forecast_data(forecast_raw)
+                    forecast_df = self.validate_weather_data(forecast_df, 'weather_forecast')
                     if forecast_df is not None:
                         self.load_weather_data(forecast_df, 'weather_forecast')
             
@@ -225,6 +292,7 @@ class WeatherETL:
         except Exception as e:
             print(f"Error in weather ETL pipeline: {e}")
 
+    @profile_stage()
     def get_latest_weather_summary(self):
         try:
             conn = sqlite3.connect(self.database_path)
@@ -263,15 +331,21 @@ class WeatherETL:
             print(f"Error getting weather summary: {e}")
 
 
+@profile_stage()
 def extract_data(file_path):
     data = pd.read_csv(file_path)
     return data
 
+@profile_stage()
+def validate_data(data):
+    return validate_dataframe(data, LEGACY_USER_RULES)
+
+@profile_stage()
 def transform_data(data):
-    data = data.dropna()  
-    data = data[data['0'] > 18]
-    return data
+    valid_data, _ = validate_data(data)
+    return valid_data
 
+@profile_stage()
 def load_data(data, database_path):
     conn = sqlite3.connect(database_path)
     cursor = conn.cursor()
@@ -295,8 +369,9 @@ def load_data(data, database_path):
 def run_legacy_etl_pipeline():
     try:
         data = extract_data('data/source_data.csv')
-        transformed_data = transform_data(data)
+        transformed_data, quarantined_data = validate_data(data)
         load_data(transformed_data, 'data/destination.db')
+        load_quarantine(quarantined_data, 'users', 'data/destination.db')
         print("Legacy ETL pipeline completed successfully")
         
     except Exception as e:
@@ -304,6 +379,9 @@ def run_legacy_etl_pipeline():
 
 
 if __name__ == "__main__":
+    if profiling_requested():
+        enable_profiling()
+    
     print("Choose ETL pipeline to run:")
     print("1. Weather ETL Pipeline (recommended)")
     print("2. Legacy CSV ETL Pipeline")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+import argparse
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+PROFILE_DIR = os.path.join('logs', 'profiles')
+TOP_ALLOCATIONS = 15
+
+_active_run = None
+
+
+class ProfileRun:
+    def __init__(self, base_dir=PROFILE_DIR):
+        # The PID keeps concurrent runs (e.g. the scheduler and a manual run)
+        # apart; the suffix loop covers anything that still collides.
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        os.makedirs(base_dir, exist_ok=True)
+        suffix = 1
+        while True:
+            self.run_id = run_id if suffix == 1 else f"{run_id}-{suffix}"
+            self.run_dir = os.path.join(base_dir, self.run_id)
+            try:
+                os.makedirs(self.run_dir)
+                break
+            except FileExistsError:
+                suffix += 1
+        self.stages = []
+        self._stage_counts = {}
+        self._in_stage = False
+
+    def _stage_key(self, name):
+        count = self._stage_counts.get(name, 0) + 1
+        self._stage_counts[name] = count
+        return name if count == 1 else f"{name}-{count}"
+
+    def profile(self, name, func, *args, **kwargs):
+        # cProfile cannot be nested, so stages called from inside another
+        # stage are attributed to the outer one.
+        if self._in_stage:
+            return func(*args, **kwargs)
+
+        self._in_stage = True
+        key = self._stage_key(name)
+        profiler = cProfile.Profile()
+        # Tracing the caller already started is left running; the peak is
+        # reset and allocations are diffed against a snapshot taken here so
+        # only this stage's memory is reported either way.
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start_snapshot = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            allocation_stats = tracemalloc.take_snapshot().compare_to(start_snapshot, 'lineno')
+            if started_tracing:
+                tracemalloc.stop()
+            self._in_stage = False
+            self._write_stage(key, name, profiler, allocation_stats, max(peak - baseline, 0), elapsed)
+
+    def _write_stage(self, key, name, profiler, allocation_stats, peak, elapsed):
+        profiler.dump_stats(os.path.join(self.run_dir, f"{key}.prof"))
+
+        allocations = [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_bytes': stat.size_diff,
+                'count': stat.count_diff
+            }
+            for stat in allocation_stats[:TOP_ALLOCATIONS]
+        ]
+        with open(os.path.join(self.run_dir, f"{key}.alloc.json"), 'w') as f:
+            json.dump({'stage': key, 'peak_bytes': peak, 'top_allocations': allocations}, f, indent=2)
+
+        self.stages.append({'stage': key, 'name': name, 'seconds': round(elapsed, 6), 'peak_bytes': peak})
+        self._write_summary()
+
+    def _write_summary(self):
+        with open(os.path.join(self.run_dir, 'run.json'), 'w') as f:
+            json.dump({'run_id': self.run_id, 'stages': self.stages}, f, indent=2)
+
+
+def enable_profiling(base_dir=PROFILE_DIR):
+    global _active_run
+    _active_run = ProfileRun(base_dir)
+    print(f"Profiling enabled - writing stage profiles to {_active_run.run_dir}")
+    return _active_run
+
+
+def disable_profiling():
+    global _active_run
+    run, _active_run = _active_run, None
+    return run
+
+
+def profiling_requested(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    return '--profile' in argv or os.getenv('ETL_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+def profile_stage(name=None, label_arg=None):
+    # label_arg names an argument whose value is appended to the stage name
+    # (e.g. the table being loaded), so stage keys match up between runs even
+    # when an earlier stage was skipped.
+    def decorator(func):
+        stage_name = name or func.__name__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_run is None:
+                return func(*args, **kwargs)
+            full_name = stage_name
+            if label_arg:
+                label = signature.bind(*args, **kwargs).arguments.get(label_arg)
+                if label is not None:
+                    full_name = f"{stage_name}.{label}"
+            return _active_run.profile(full_name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _resolve_run_dir(run, base_dir):
+    run_dir = run if os.path.isdir(run) else os.path.join(base_dir, run)
+    if not os.path.exists(os.path.join(run_dir, 'run.json')):
+        return None
+    return run_dir
+
+
+def _load_run(run_dir):
+    with open(os.path.join(run_dir, 'run.json')) as f:
+        summary = json.load(f)
+
+    functions = {}
+    for stage in summary['stages']:
+        stats = pstats.Stats(os.path.join(run_dir, f"{stage['stage']}.prof"))
+        for (filename, lineno, funcname), (_, _, tottime, cumtime, _) in stats.stats.items():
+            label = f"{os.path.basename(filename)}:{lineno}({funcname})"
+            total = functions.setdefault(label, [0.0, 0.0])
+            total[0] += tottime
+            total[1] += cumtime
+
+    return summary, functions
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def diff_runs(run_a, run_b, top=20, base_dir=PROFILE_DIR):
+    run_dirs = []
+    for run in (run_a, run_b):
+        run_dir = _resolve_run_dir(run, base_dir)
+        if run_dir is None:
+            print(f"Profiling run not found: {run} (see 'list' for runs in {base_dir})")
+            return False
+        run_dirs.append(run_dir)
+
+    summary_a, functions_a = _load_run(run_dirs[0])
+    summary_b, functions_b = _load_run(run_dirs[1])
+
+    print(f"=== Stage comparison: {summary_a['run_id']} -> {summary_b['run_id']} ===")
+    stages_a = {stage['stage']: stage for stage in summary_a['stages']}
+    stages_b = {stage['stage']: stage for stage in summary_b['stages']}
+    keys = list(stages_a) + [key for key in stages_b if key not in stages_a]
+    width = max([len('stage')] + [len(key) for key in keys])
+    print(f"{'stage':<{width}} {'time A':>10} {'time B':>10} {'delta':>10} {'peak A':>12} {'peak B':>12}")
+    for key in keys:
+        a = stages_a.get(key, {'seconds': 0.0, 'peak_bytes': 0})
+        b = stages_b.get(key, {'seconds': 0.0, 'peak_bytes': 0})
+        print(f"{key:<{width}} {a['seconds']:>9.3f}s {b['seconds']:>9.3f}s {b['seconds'] - a['seconds']:>+9.3f}s "
+              f"{_format_bytes(a['peak_bytes']):>12} {_format_bytes(b['peak_bytes']):>12}")
+
+    print(f"\n=== Hot functions by self-time change (top {top}) ===")
+    deltas = []
+    for label in set(functions_a) | set(functions_b):
+        tottime_a = functions_a.get(label, [0.0, 0.0])[0]
+        tottime_b = functions_b.get(label, [0.0, 0.0])[0]
+        deltas.append((tottime_b - tottime_a, tottime_a, tottime_b, label))
+    deltas.sort(key=lambda delta: abs(delta[0]), reverse=True)
+    print(f"{'self A':>10} {'self B':>10} {'delta':>10}  function")
+    for delta, tottime_a, tottime_b, label in deltas[:top]:
+        print(f"{tottime_a:>9.4f}s {tottime_b:>9.4f}s {delta:>+9.4f}s  {label}")
+
+    return True
+
+
+def list_runs(base_dir=PROFILE_DIR):
+    if not os.path.isdir(base_dir):
+        print(f"No profiling runs found in {base_dir}")
+        return
+
+    for run_id in sorted(os.listdir(base_dir)):
+        summary_path = os.path.join(base_dir, run_id, 'run.json')
+        if not os.path.exists(summary_path):
+            continue
+        with open(summary_path) as f:
+            stages = json.load(f)['stages']
+        total = sum(stage['seconds'] for stage in stages)
+        peak = max((stage['peak_bytes'] for stage in stages), default=0)
+        print(f"{run_id}  {len(stages):>3} stages  {total:>9.3f}s  peak {_format_bytes(peak)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and compare ETL pipeline profiling runs")
+    parser.add_argument('--dir', default=PROFILE_DIR, help="Directory containing profiling runs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help="List recorded profiling runs")
+
+    diff_parser = subparsers.add_parser('diff', help="Compare hot functions and allocation peaks of two runs")
+    diff_parser.add_argument('run_a', help="Baseline run id or directory")
+    diff_parser.add_argument('run_b', help="Run id or directory to compare against the baseline")
+    diff_parser.add_argument('--top', type=int, default=20, help="Number of functions to show")
+
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        list_runs(args.dir)
+    elif args.command == 'diff':
+        if not diff_runs(args.run_a, args.run_b, args.top, args.dir):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_validation import (
+    WEATHER_VALIDATION_RULES, greater_than, in_range, monotonic_timestamps, not_null, one_of, validate_dataframe
+)
+
+spec = importlib.util.spec_from_file_location("etl_pipeline", os.path.join(ROOT, "etl-pipeline.py"))
+etl_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(etl_module)
+
+
+def passed(rule, df):
+    return rule.check(df).tolist()
+
+
+def test_not_null():
+    df = pd.DataFrame({'a': [1, None, 3], 'b': ['x', 'y', None]})
+    assert passed(not_null('a'), df) == [True, False, True]
+    assert passed(not_null(), df) == [True, False, False]
+    assert passed(not_null('missing'), df) == [False, False, False]
+
+
+def test_in_range():
+    df = pd.DataFrame({'humidity': [0, 50, 100, 101, -1, None, 'wet']})
+    assert passed(in_range('humidity', 0, 100), df) == [True, True, True, False, False, False, False]
+    assert passed(in_range('humidity', min_value=50), df) == [False, True, True, True, False, False, False]
+
+
+def test_greater_than():
+    df = pd.DataFrame({'0': [18, 19, None]})
+    assert passed(greater_than('0', 18), df) == [False, True, False]
+
+
+def test_one_of():
+    df = pd.DataFrame({'weather_main': ['Clear', 'Sunny', None]})
+    assert passed(one_of('weather_main', {'Clear', 'Rain'}), df) == [True, False, False]
+
+
+def test_monotonic_timestamps_per_group():
+    df = pd.DataFrame({
+        'city': ['A', 'B', 'A', 'B', 'A'],
+        'ts': ['2025-01-01T00:00', '2025-01-01T06:00', '2025-01-01T03:00', '2025-01-01T03:00', 'bad'],
+    })
+    assert passed(monotonic_timestamps('ts', group_by='city'), df) == [True, True, True, False, False]
+
+
+def test_monotonic_timestamps_compares_against_running_max():
+    # One bogus late timestamp flags every later row it overtakes, not only
+    # its immediate successor.
+    df = pd.DataFrame({'ts': [
+        '2025-01-01T00:00', '2025-01-05T00:00', '2025-01-01T03:00', '2025-01-01T06:00', '2025-01-06T00:00'
+    ]})
+    assert passed(monotonic_timestamps('ts'), df) == [True, True, False, False, True]
+
+
+def test_monotonic_timestamps_skips_unparseable_predecessor():
+    df = pd.DataFrame({'ts': ['2025-01-02T00:00', None, '2025-01-01T00:00']})
+    assert passed(monotonic_timestamps('ts'), df) == [True, False, False]
+
+
+def test_validate_dataframe_splits_rows_with_reasons():
+    df = pd.DataFrame({'name': ['alice', 'bob', 'carol'], 'age': [30, 12, None]})
+    valid_df, quarantined_df = validate_dataframe(df, [not_null(), greater_than('age', 18)])
+
+    assert valid_df['name'].tolist() == ['alice']
+    assert quarantined_df['reasons'].tolist() == ['greater_than:age>18', 'null:*;greater_than:age>18']
+    records = [json.loads(record) for record in quarantined_df['record']]
+    assert records == [{'name': 'bob', 'age': 12.0}, {'name': 'carol', 'age': None}]
+
+
+def test_validate_dataframe_all_valid():
+    df = pd.DataFrame({'age': [30, 40]})
+    valid_df, quarantined_df = validate_dataframe(df, [greater_than('age', 18)])
+    assert len(valid_df) == 2
+    assert quarantined_df is None
+
+
+def _forecast_item(dt, **overrides):
+    item = {
+        'dt': dt,
+        'main': {'temp': 20.0, 'feels_like': 19.0, 'humidity': 60, 'pressure': 1012},
+        'weather': [{'main': 'Clear', 'description': 'clear sky'}],
+        'wind': {'speed': 3.0, 'deg': 180},
+        'clouds': {'all': 10},
+        'visibility': 10000,
+        'pop': 0.2,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_bad_forecast_fields_are_quarantined_per_row():
+    forecast = {
+        'city': {'name': 'London', 'country': 'GB'},
+        'list': [
+            _forecast_item(1754550000),
+            _forecast_item(1754560800, visibility=None),
+            _forecast_item(1e20),
+            _forecast_item(1754582400, pop='wet'),
+            _forecast_item(1754593200, main={'temp': 21.0}),
+        ],
+    }
+    etl = etl_module.WeatherETL()
+    df = etl.transform_forecast_data(forecast)
+    assert len(df) == 5
+    assert df['visibility'].isna().tolist() == [False, True, False, False, False]
+    assert df['forecast_timestamp'].isna().tolist() == [False, False, True, False, False]
+
+    valid_df, quarantined_df = validate_dataframe(df, WEATHER_VALIDATION_RULES['weather_forecast'])
+    assert len(valid_df) == 1
+    assert len(quarantined_df) == 4
+
+
+def test_scaled_rejects_non_numeric():
+    assert etl_module._scaled('0.2', multiplier=100) == 20.0
+    assert etl_module._scaled('wet', multiplier=100) is None
+    assert etl_module._scaled(None, divisor=1000) is None
+
+
+def test_transform_data_returns_valid_frame():
+    df = pd.DataFrame({'0': [30, 12, None], '1': ['alice', 'bob', 'carol']})
+    result = etl_module.transform_data(df)
+    assert isinstance(result, pd.DataFrame)
+    assert result['1'].tolist() == ['alice']
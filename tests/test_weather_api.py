@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_api import WeatherQueryService, WeatherRequestHandler
+
+
+@pytest.fixture
+def service(tmp_path):
+    database_path = str(tmp_path / 'weather.db')
+    conn = sqlite3.connect(database_path)
+    conn.execute("CREATE TABLE current_weather (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, city TEXT, "
+                 "country TEXT, temperature REAL, humidity INTEGER, wind_speed REAL)")
+    conn.execute("CREATE TABLE weather_forecast (id INTEGER PRIMARY KEY AUTOINCREMENT, forecast_timestamp TEXT, "
+                 "city TEXT, temperature REAL)")
+    conn.execute("INSERT INTO current_weather (timestamp, city, country, temperature, humidity, wind_speed) "
+                 "VALUES ('2025-08-07T08:00:00', 'London', 'GB', 18.5, 70, 4.1)")
+    conn.executemany("INSERT INTO weather_forecast (forecast_timestamp, city, temperature) VALUES (?, 'London', ?)", [
+        ('2025-08-07T21:00:00', 16.0),
+        ('2025-08-08T00:00:00', 15.0),
+        ('2025-08-08T21:00:00', 19.0),
+        ('2025-08-09T00:00:00', 14.0),
+    ])
+    conn.commit()
+    conn.close()
+
+    service = WeatherQueryService(database_path)
+    yield service
+    service.close()
+
+
+def test_python_api_results_are_copies(service):
+    service.latest('London')['current']['temperature'] = -999
+    assert service.latest('London')['current']['temperature'] == 18.5
+
+
+def test_forecast_date_only_end_covers_whole_day(service):
+    forecast = service.forecast('London', start='2025-08-08', end='2025-08-08')
+    assert [row['forecast_timestamp'] for row in forecast['forecast']] == [
+        '2025-08-08T00:00:00', '2025-08-08T21:00:00'
+    ]
+
+
+def test_forecast_datetime_bounds_are_inclusive(service):
+    forecast = service.forecast('London', start='2025-08-07T21:00', end='2025-08-08T00:00:00')
+    assert forecast['count'] == 2
+
+
+@pytest.mark.parametrize('start, end', [('yesterday', None), (None, '2025-13-01'), ('2025-08-09', '2025-08-08')])
+def test_forecast_rejects_bad_bounds(service, start, end):
+    with pytest.raises(ValueError):
+        service.forecast('London', start=start, end=end)
+
+
+def test_rollup_rejects_unbounded_days(service):
+    with pytest.raises(ValueError):
+        service.rollup('London', days=99999999999)
+
+
+@pytest.fixture
+def base_url(service):
+    handler = type('TestHandler', (WeatherRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url, headers=None):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+            return response.status, response.headers.get('ETag'), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('ETag'), e.read()
+
+
+def test_http_etag_weak_comparison(base_url):
+    status, etag, body = _get(f"{base_url}/weather/latest?city=London")
+    assert status == 200
+    assert json.loads(body)['current']['city'] == 'London'
+
+    assert _get(f"{base_url}/weather/latest?city=London", {'If-None-Match': etag})[0] == 304
+    assert _get(f"{base_url}/weather/latest?city=London", {'If-None-Match': f"W/{etag}"})[0] == 304
+
+
+def test_http_bad_parameters_are_400(base_url):
+    assert _get(f"{base_url}/weather/forecast?city=London&end=tomorrow")[0] == 400
+    assert _get(f"{base_url}/weather/rollup?city=London&days=99999999999")[0] == 400
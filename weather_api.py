@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_ROLLUP_DAYS = 3660
+
+
+class DataUnavailableError(Exception):
+    pass
+
+
+def _parse_bound(value, name, end_of_day=False):
+    # Normalises a start/end parameter to the isoformat used in the forecast
+    # table so the bounds compare correctly as strings. A date-only end covers
+    # the whole of that day.
+    if not value:
+        return None
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        moment = datetime.combine(day, datetime.max.time() if end_of_day else datetime.min.time())
+    else:
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO date or datetime, got {value!r}")
+        if moment.tzinfo is not None:
+            raise ValueError(f"{name} must be a local time without a UTC offset")
+    return moment.isoformat()
+
+
+class ConnectionPool:
+    def __init__(self, database_path, size=8, timeout=5.0):
+        self.database_path = database_path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(None)
+
+    def connect(self):
+        if not os.path.exists(self.database_path):
+            raise DataUnavailableError(f"Database not found: {self.database_path}")
+        conn = sqlite3.connect(
+            f"file:{os.path.abspath(self.database_path)}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            timeout=self.timeout
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        # Connections are opened lazily so the pool can be created before the
+        # first load has produced a database file.
+        conn = self._pool.get(timeout=self.timeout)
+        try:
+            if conn is None:
+                conn = self.connect()
+            yield conn
+        except sqlite3.DatabaseError:
+            if conn is not None:
+                conn.close()
+            conn = None
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            conn = self._pool.get_nowait()
+            if conn is not None:
+                conn.close()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CachedResponse:
+    def __init__(self, payload):
+        self.body = json.dumps(payload, default=str).encode('utf-8')
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'
+
+
+class WeatherQueryService:
+    def __init__(self, database_path=None, pool_size=8, cache_size=256):
+        self.database_path = database_path or os.getenv('DATABASE_PATH', 'data/weather_data.db')
+        self.default_city = os.getenv('WEATHER_CITY', 'New York')
+        self.pool = ConnectionPool(self.database_path, size=pool_size)
+        self.cache = ResponseCache(cache_size)
+        self._version_lock = threading.Lock()
+        self._version_conn = None
+        self._data_version = None
+
+    def _refresh_cache(self):
+        # PRAGMA data_version changes whenever another connection commits to
+        # the database, so any committed load (in this process or the
+        # scheduler's) invalidates every cached response.
+        with self._version_lock:
+            try:
+                if self._version_conn is None:
+                    self._version_conn = self.pool.connect()
+                version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                if self._version_conn is not None:
+                    self._version_conn.close()
+                    self._version_conn = None
+                raise DataUnavailableError(f"Database unavailable: {e}")
+
+            if version != self._data_version:
+                self.cache.clear()
+                self._data_version = version
+            return version
+
+    def _query(self, sql, params=()):
+        try:
+            with self.pool.connection() as conn:
+                return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        except sqlite3.DatabaseError as e:
+            raise DataUnavailableError(f"Query failed: {e}")
+
+    def _cached(self, key, build_payload):
+        # Keying on the data version keeps a response built from a snapshot
+        # taken just before a commit from outliving the invalidation.
+        key = (self._refresh_cache(),) + key
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = CachedResponse(build_payload())
+            self.cache.put(key, entry)
+        return entry
+
+    def cities_response(self):
+        return self._cached(('cities',), lambda: {
+            'cities': self._query('''
+                SELECT city, country, COUNT(*) AS observations, MAX(timestamp) AS last_observed
+                FROM current_weather
+                GROUP BY city, country
+                ORDER BY city
+            ''')
+        })
+
+    def latest_response(self, city=None):
+        city = city or self.default_city
+
+        def build():
+            rows = self._query('''
+                SELECT * FROM current_weather
+                WHERE city = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (city,))
+            return {'city': city, 'current': rows[0] if rows else None}
+
+        return self._cached(('latest', city), build)
+
+    def forecast_response(self, city=None, start=None, end=None):
+        city = city or self.default_city
+        start = _parse_bound(start, 'start')
+        end = _parse_bound(end, 'end', end_of_day=True)
+        if start and end and start > end:
+            raise ValueError("start must not be after end")
+
+        def build():
+            # Each daily run appends a fresh forecast, so only the most
+            # recently loaded row for every forecast timestamp is returned.
+            rows = self._query('''
+                SELECT * FROM weather_forecast
+                WHERE id IN (
+                    SELECT MAX(id) FROM weather_forecast
+                    WHERE city = ?
+                      AND (? IS NULL OR forecast_timestamp >= ?)
+                      AND (? IS NULL OR forecast_timestamp <= ?)
+                    GROUP BY forecast_timestamp
+                )
+                ORDER BY forecast_timestamp
+            ''', (city, start, start, end, end))
+            temperatures = [row['temperature'] for row in rows if row['temperature'] is not None]
+            return {
+                'city': city,
+                'start': start,
+                'end': end,
+                'count': len(rows),
+                'temperature_min': min(temperatures) if temperatures else None,
+                'temperature_max': max(temperatures) if temperatures else None,
+                'forecast': rows
+            }
+
+        return self._cached(('forecast', city, start, end), build)
+
+    def rollup_response(self, city=None, days=7):
+        if not 1 <= days <= MAX_ROLLUP_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_ROLLUP_DAYS}")
+        city = city or self.default_city
+        since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+        def build():
+            rows = self._query('''
+                SELECT DATE(timestamp) AS date,
+                       COUNT(*) AS observations,
+                       MIN(temperature) AS temperature_min,
+                       MAX(temperature) AS temperature_max,
+                       AVG(temperature) AS temperature_avg,
+                       AVG(humidity) AS humidity_avg,
+                       MAX(wind_speed) AS wind_speed_max
+                FROM current_weather
+                WHERE city = ? AND DATE(timestamp) >= ?
+                GROUP BY DATE(timestamp)
+                ORDER BY date
+            ''', (city, since))
+            return {'city': city, 'days': days, 'since': since, 'rollup': rows}
+
+        return self._cached(('rollup', city, days, since), build)
+
+    def _payload(self, response):
+        # Callers get their own copy so mutating a result cannot leak into
+        # the shared cache.
+        return json.loads(response.body)
+
+    def cities(self):
+        return self._payload(self.cities_response())
+
+    def latest(self, city=None):
+        return self._payload(self.latest_response(city))
+
+    def forecast(self, city=None, start=None, end=None):
+        return self._payload(self.forecast_response(city, start, end))
+
+    def rollup(self, city=None, days=7):
+        return self._payload(self.rollup_response(city, days))
+
+    def close(self):
+        self.pool.close()
+        if self._version_conn is not None:
+            self._version_conn.close()
+
+
+class WeatherRequestHandler(BaseHTTPRequestHandler):
+    service = None
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Cache-Control', 'no-cache')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, json.dumps({'error': message}).encode('utf-8'))
+
+    def _route(self, path, params):
+        city = params.get('city')
+        if path == '/cities':
+            return self.service.cities_response()
+        if path == '/weather/latest':
+            return self.service.latest_response(city)
+        if path == '/weather/forecast':
+            return self.service.forecast_response(city, params.get('start'), params.get('end'))
+        if path == '/weather/rollup':
+            days = int(params.get('days', 7))
+            return self.service.rollup_response(city, days)
+        return None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            response = self._route(url.path.rstrip('/') or '/', params)
+        except ValueError as e:
+            self._send_error(400, f"Invalid parameter: {e}")
+            return
+        except (DataUnavailableError, queue.Empty) as e:
+            self._send_error(503, str(e) or "No database connection available")
+            return
+
+        if response is None:
+            self._send_error(404, f"Unknown endpoint: {url.path}")
+            return
+
+        # If-None-Match uses weak comparison, so a W/ prefix is ignored.
+        if_none_match = self.headers.get('If-None-Match', '')
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if response.etag in tags or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.end_headers()
+            return
+
+        self._send_json(200, response.body, response.etag)
+
+
+def serve(host='127.0.0.1', port=8000, database_path=None, pool_size=8, cache_size=256, verbose=False):
+    service = WeatherQueryService(database_path, pool_size=pool_size, cache_size=cache_size)
+    handler = type('BoundWeatherRequestHandler', (WeatherRequestHandler,), {
+        'service': service,
+        'verbose': verbose
+    })
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Serving weather data from {service.database_path} on http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down weather API")
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the weather database")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--database', default=None, help="Defaults to DATABASE_PATH from .env")
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--cache-size', type=int, default=256)
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.database, args.pool_size, args.cache_size, args.verbose)
+
+
+if __name__ == "__main__":
+    main()